@@ -1,6 +1,7 @@
 """Backend functions for zernipax, with options for JAX or regular numpy."""
 
 import functools
+import os
 import warnings
 
 import numpy as np
@@ -10,330 +11,551 @@ from zernipax import config, set_device
 
 if config.get("device") is None:
     set_device("cpu")
-try:
-    with warnings.catch_warnings():
-        warnings.simplefilter("ignore")
-        import jax
-        import jax.numpy as jnp
-        import jaxlib
-        from jax import config as jax_config
-
-        jax_config.update("jax_enable_x64", True)
-        if config.get("kind") == "gpu" and len(jax.devices("gpu")) == 0:
-            warnings.warn(
-                "JAX failed to detect GPU, are you sure you "
-                + "installed JAX with GPU support?"
+
+use_jax = None
+
+# Names resolved lazily on first attribute access, so that plain
+# ``import zernipax.backend`` does not pay for the JAX import (and the
+# XLA backend initialization it triggers) unless one of these is used.
+_backend_attrs = (
+    "jax",
+    "jaxlib",
+    "jnp",
+    "jit",
+    "fori_loop",
+    "cond",
+    "switch",
+    "while_loop",
+    "vmap",
+    "scan",
+    "select",
+    "bincount",
+    "gammaln",
+    "gammaln_int",
+    "put",
+    "sign",
+    "custom_jvp",
+    "custom_jvp_with_jit",
+    "execute_on_cpu",
+)
+
+
+def __getattr__(name):
+    """Resolve backend attributes on first access (PEP 562)."""
+    if name in _backend_attrs:
+        _init_backend()
+        try:
+            return globals()[name]
+        except KeyError:
+            pass
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
+
+def _init_backend():  # noqa: C901
+    """Import JAX if available, else fall back to numpy, and populate globals.
+
+    Runs at most once, on first access to one of the backend attributes.
+    """
+    global use_jax
+    if use_jax is not None:
+        return
+    # pin the platform via environment *before* importing JAX, so the first
+    # jax.devices() call initializes the requested backend once instead of
+    # probing every plugin and re-initializing after the CPU fallback
+    if config.get("kind") == "cpu":
+        os.environ.setdefault("JAX_PLATFORMS", "cpu")
+    else:
+        # defer CUDA module loading until a kernel actually launches,
+        # instead of paying for it during backend initialization
+        os.environ.setdefault("CUDA_MODULE_LOADING", "LAZY")
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            import jax
+            import jax.numpy as jnp
+            import jaxlib
+            from jax import config as jax_config
+
+            jax_config.update("jax_enable_x64", True)
+            # only probe for GPUs when one was requested; on CPU the probe
+            # would needlessly initialize the CUDA driver
+            if config.get("kind") == "gpu":
+                try:
+                    gpus = jax.devices("gpu")
+                except RuntimeError:
+                    gpus = []
+                if not gpus:
+                    warnings.warn(
+                        "JAX failed to detect GPU, are you sure you "
+                        + "installed JAX with GPU support?"
+                    )
+                    set_device("cpu")
+        use_jax = True
+        # query the default dtype from the config instead of executing a
+        # throwaway kernel (trace+compile+execute) just to inspect it
+        dtype = jnp.float64 if jax_config.read("jax_enable_x64") else jnp.float32
+        print(
+            f"using JAX backend, jax version={jax.__version__}, "
+            + f"jaxlib version={jaxlib.__version__}, dtype={jnp.dtype(dtype)}"
+        )
+    except ModuleNotFoundError:
+        jnp = np
+        use_jax = False
+        set_device(kind="cpu")
+        warnings.warn(colored("Failed to load JAX", "red"))
+        print(
+            "Using NumPy backend, version={}, dtype={}".format(
+                np.__version__, np.dtype(np.float64)
             )
-            set_device("cpu")
-        x = jnp.linspace(0, 5)
-        y = jnp.exp(x)
-    use_jax = True
+        )
     print(
-        f"using JAX backend, jax version={jax.__version__}, "
-        + f"jaxlib version={jaxlib.__version__}, dtype={y.dtype}"
-    )
-    del x, y
-except ModuleNotFoundError:
-    jnp = np
-    x = jnp.linspace(0, 5)
-    y = jnp.exp(x)
-    use_jax = False
-    set_device(kind="cpu")
-    warnings.warn(colored("Failed to load JAX", "red"))
-    print("Using NumPy backend, version={}, dtype={}".format(np.__version__, y.dtype))
-print(
-    "Using device: {}, with {:.2f} GB available memory".format(
-        config.get("device"), config.get("avail_mem")
+        "Using device: {}, with {:.2f} GB available memory".format(
+            config.get("device"), config.get("avail_mem")
+        )
     )
-)
 
+    if use_jax:  # noqa C901
+        jit = jax.jit
+        fori_loop = jax.lax.fori_loop
+        cond = jax.lax.cond
+        switch = jax.lax.switch
+        while_loop = jax.lax.while_loop
+        vmap = jax.vmap
+        scan = jax.lax.scan
+        select = jax.lax.select
+        bincount = jnp.bincount
+        from jax import custom_jvp
+        from jax.scipy.special import gammaln
+
+        # optional persistent cache for AOT-compiled kernels, enabled with
+        # ZERNIPAX_JIT_CACHE=1. The same directory is handed to XLA's own
+        # compilation cache so plain jit also reuses binaries across sessions.
+        _jit_cache_dir = None
+        if os.environ.get("ZERNIPAX_JIT_CACHE") == "1":
+            _jit_cache_dir = os.path.join(
+                os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")),
+                "zernipax",
+                "aot",
+            )
+            os.makedirs(_jit_cache_dir, exist_ok=True)
+            jax_config.update("jax_compilation_cache_dir", _jit_cache_dir)
+
+        def put(arr, inds, vals):
+            """Functional interface for array "fancy indexing".
+
+            Provides a way to do arr[inds] = vals in a way that works with JAX.
+
+            Parameters
+            ----------
+            arr : array-like
+                Array to populate
+            inds : array-like of int
+                Indices to populate
+            vals : array-like
+                Values to insert
+
+            Returns
+            -------
+            arr : array-like
+                Input array with vals inserted at inds.
+
+            """
+            if isinstance(arr, np.ndarray):
+                arr[inds] = vals
+                return arr
+            if not isinstance(arr, jax.Array):
+                # only convert when needed; asarray on an on-device array
+                # still traces an identity op under jit
+                arr = jnp.asarray(arr)
+            if isinstance(inds, (slice, range)) and inds.step in (None, 1):
+                # a contiguous unit-step update lowers to
+                # dynamic_update_slice (a straight copy) instead of the
+                # general scatter that .at[].set emits
+                start = inds.start if inds.start is not None else 0
+                stop = inds.stop if inds.stop is not None else arr.shape[0]
+                if 0 <= start <= stop <= arr.shape[0]:
+                    vals = jnp.broadcast_to(vals, (stop - start,) + arr.shape[1:])
+                    return jax.lax.dynamic_update_slice(
+                        arr,
+                        vals.astype(arr.dtype),
+                        (start,) + (0,) * (arr.ndim - 1),
+                    )
+            elif getattr(inds, "dtype", None) == bool and (
+                jnp.ndim(vals) == 0 or jnp.shape(vals) == arr.shape
+            ):
+                # boolean mask with scalar or full-shape vals is a select,
+                # not a scatter
+                return jnp.where(inds, vals, arr)
+            return arr.at[inds].set(vals)
+
+        def sign(x):
+            """Sign function, but returns 1 for x==0.
+
+            Parameters
+            ----------
+            x : array-like
+                array of input values
+
+            Returns
+            -------
+            y : array-like
+                1 where x>=0, -1 where x<0
+
+            """
+            if jnp.ndim(x) == 0:
+                x = jnp.atleast_1d(x)
+            # lax.select on the sign bit stays a single elementwise pass and
+            # skips the weak-type promotion (and its convert_element_type)
+            # that jnp-level arithmetic with Python ints would introduce
+            x = jnp.asarray(x)
+            return jax.lax.select(
+                jnp.signbit(x), jax.lax.full_like(x, -1), jax.lax.full_like(x, 1)
+            )
+
+        # decorated kernels keyed by bytecode, so semantically identical
+        # functions share one jitted/compiled object instead of each
+        # producing its own XLA executable
+        _jit_dedupe_cache = {}
+
+        def custom_jvp_with_jit(func):
+            """Decorator for custom_jvp with jit.
+
+            This decorator is specifically with functions that have the same
+            structure as the zernike_radial such as r, l, m, dr, where dr is
+            the static argument.
+            """
+            # co_code alone can collide for functions that only differ in
+            # their constants or referenced globals, so key on those too
+            code = func.__code__
+            code_key = (code.co_code, code.co_consts, code.co_names)
+            if code_key in _jit_dedupe_cache:
+                return _jit_dedupe_cache[code_key]
+
+            @functools.partial(
+                custom_jvp,
+                nondiff_argnums=(3,),
+            )
+            def dummy(r, l, m, dr):
+                return func(r, l, m, dr)
+
+            @dummy.defjvp
+            def _dummy_jvp(nondiff_dr, x, xdot):
+                """Custom derivative rule for the function.
+
+                This is just the same function called with dx+1.
+                """
+                (r, l, m) = x
+                (rdot, ldot, mdot) = xdot
+                f = dummy(r, l, m, nondiff_dr)
+                df = dummy(r, l, m, nondiff_dr + 1)
+                # output tangent only depends on rdot; JVP rules don't need
+                # the zero ldot/mdot terms (which also break on float0
+                # tangents from integer arguments). Broadcasting rdot over
+                # the trailing axes directly avoids the transpose pair that
+                # (df.T * rdot).T put in the traced graph.
+                rdot = jnp.reshape(
+                    rdot, jnp.shape(rdot) + (1,) * (jnp.ndim(df) - jnp.ndim(rdot))
+                )
+                return f, df * rdot
+
+            jitted = jit(dummy, static_argnums=3)
+            # AOT-compiled executables keyed by dr and input shapes/dtypes.
+            # Each distinct dr is a fresh trace+compile under static_argnums,
+            # and the JVP rule needs dr+1 as well, so compile both together
+            # the first time a given dr is requested.
+            _compiled = {}
+
+            def _aot_compile(r, l, m, d):
+                """Compile for concrete inputs, reusing the disk cache if on."""
+                if _jit_cache_dir is None:
+                    return jitted.lower(r, l, m, d).compile()
+                from jax import export as jax_export
+
+                name = "-".join(
+                    [func.__module__, func.__qualname__]
+                    + ["x".join(map(str, a.shape)) + str(a.dtype) for a in (r, l, m)]
+                    + ["dr{}".format(d)]
+                )
+                path = os.path.join(_jit_cache_dir, name + ".jaxexport")
+                try:
+                    with open(path, "rb") as f:
+                        return jax_export.deserialize(f.read()).call
+                except FileNotFoundError:
+                    pass
+                except Exception:
+                    # stale or corrupt cache entry, fall through and recompile
+                    pass
+                exported = jax_export.export(jitted)(r, l, m, d)
+                try:
+                    with open(path, "wb") as f:
+                        f.write(exported.serialize())
+                except (OSError, ImportError):
+                    pass
+                return exported.call
+
+            @functools.wraps(func)
+            def wrapper(r, l, m, dr=0):
+                if any(isinstance(arg, jax.core.Tracer) for arg in (r, l, m)):
+                    # under jit/vmap/grad tracing, defer to the jitted
+                    # function so the custom JVP rule applies
+                    return jitted(r, l, m, dr)
+                r, l, m = jnp.asarray(r), jnp.asarray(l), jnp.asarray(m)
+                dr = int(dr)
+                key = (dr, r.shape, r.dtype, l.shape, l.dtype, m.shape, m.dtype)
+                if key not in _compiled:
+                    _compiled[key] = _aot_compile(r, l, m, dr)
+                    try:
+                        _compiled[(dr + 1,) + key[1:]] = _aot_compile(
+                            r, l, m, dr + 1
+                        )
+                    except NotImplementedError:
+                        # derivative order dr+1 not implemented by func
+                        pass
+                return _compiled[key](r, l, m)
+
+            _jit_dedupe_cache[code_key] = wrapper
+            return wrapper
+
+        def execute_on_cpu(func):
+            """Decorator to set default device to CPU for a function.
+
+            Parameters
+            ----------
+            func : callable
+                Function to decorate
+
+            Returns
+            -------
+            wrapper : callable
+                Decorated function that will run always on CPU even if
+                there are available GPUs.
+            """
+
+            if jax.default_backend() == "cpu":
+                # everything already runs on CPU, so the context manager
+                # would be a per-call no-op; skip the wrapper entirely
+                return func
+            # resolve the device once at decoration time; jax.devices()
+            # rebuilds a list on every call, which adds up in hot loops
+            _cpu_cm = functools.partial(jax.default_device, jax.devices("cpu")[0])
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with _cpu_cm():
+                    return func(*args, **kwargs)
+
+            return wrapper
+
+    else:
+        jit = lambda func, *args, **kwargs: func
+        custom_jvp_with_jit = lambda func, *args, **kwargs: func
+        execute_on_cpu = lambda func: func
+        from scipy.special import gammaln  # noqa F401
+
+        def put(arr, inds, vals):
+            """Functional interface for array "fancy indexing".
+
+            Provides a way to do arr[inds] = vals in a way that works with JAX.
+
+            Parameters
+            ----------
+            arr : array-like
+                Array to populate
+            inds : array-like of int
+                Indices to populate
+            vals : array-like
+                Values to insert
+
+            Returns
+            -------
+            arr : array-like
+                Input array with vals inserted at inds.
 
-if use_jax:  # noqa C901
-    jit = jax.jit
-    fori_loop = jax.lax.fori_loop
-    cond = jax.lax.cond
-    switch = jax.lax.switch
-    while_loop = jax.lax.while_loop
-    vmap = jax.vmap
-    scan = jax.lax.scan
-    select = jax.lax.select
-    bincount = jnp.bincount
-    from jax import custom_jvp
-    from jax.scipy.special import gammaln
-
-    def put(arr, inds, vals):
-        """Functional interface for array "fancy indexing".
-
-        Provides a way to do arr[inds] = vals in a way that works with JAX.
-
-        Parameters
-        ----------
-        arr : array-like
-            Array to populate
-        inds : array-like of int
-            Indices to populate
-        vals : array-like
-            Values to insert
-
-        Returns
-        -------
-        arr : array-like
-            Input array with vals inserted at inds.
-
-        """
-        if isinstance(arr, np.ndarray):
+            """
             arr[inds] = vals
             return arr
-        return jnp.asarray(arr).at[inds].set(vals)
 
-    def sign(x):
-        """Sign function, but returns 1 for x==0.
+        def sign(x):
+            """Sign function, but returns 1 for x==0.
 
-        Parameters
-        ----------
-        x : array-like
-            array of input values
+            Parameters
+            ----------
+            x : array-like
+                array of input values
 
-        Returns
-        -------
-        y : array-like
-            1 where x>=0, -1 where x<0
+            Returns
+            -------
+            y : array-like
+                1 where x>=0, -1 where x<0
 
-        """
-        x = jnp.atleast_1d(x)
-        y = jnp.where(x == 0, 1, jnp.sign(x))
-        return y
+            """
+            if np.ndim(x) == 0:
+                x = np.atleast_1d(x)
+            # single elementwise pass instead of sign + compare + where
+            return (1 - 2 * np.signbit(x)).astype(np.result_type(x))
+
+        def fori_loop(lower, upper, body_fun, init_val):
+            """Loop from lower to upper, applying body_fun to init_val.
+
+            This version is for the numpy backend, for jax backend see
+            jax.lax.fori_loop
+
+            Parameters
+            ----------
+            lower : int
+                an integer representing the loop index lower bound (inclusive)
+            upper : int
+                an integer representing the loop index upper bound (exclusive)
+            body_fun : callable
+                function of type ``(int, a) -> a``.
+            init_val : array-like or container
+                initial loop carry value of type ``a``
+
+            Returns
+            -------
+            final_val: array-like or container
+                Loop value from the final iteration, of type ``a``.
 
-    def custom_jvp_with_jit(func):
-        """Decorator for custom_jvp with jit.
+            """
+            val = init_val
+            for i in range(int(lower), int(upper)):
+                val = body_fun(i, val)
+            return val
+
+        def cond(pred, true_fun, false_fun, *operand):
+            """Conditionally apply true_fun or false_fun.
+
+            This version is for the numpy backend, for jax backend see
+            jax.lax.cond
+
+            Parameters
+            ----------
+            pred: bool
+                which branch function to apply.
+            true_fun: callable
+                Function (A -> B), to be applied if pred is True.
+            false_fun: callable
+                Function (A -> B), to be applied if pred is False.
+            operand: any
+                input to either branch depending on pred. The type can be a
+                scalar, array, or any pytree (nested Python tuple/list/dict)
+                thereof.
+
+            Returns
+            -------
+            value: any
+                value of either true_fun(operand) or false_fun(operand),
+                depending on the value of pred. The type can be a scalar,
+                array, or any pytree (nested Python tuple/list/dict) thereof.
 
-        This decorator is specifically with functions that have the same
-        structure as the zernike_radial such as r, l, m, dr, where dr is
-        the static argument.
-        """
+            """
+            return true_fun(*operand) if pred else false_fun(*operand)
 
-        @functools.partial(
-            custom_jvp,
-            nondiff_argnums=(3,),
-        )
-        def dummy(r, l, m, dr):
-            return func(r, l, m, dr)
+        def switch(index, branches, *operand):
+            """Apply exactly one of branches given by index.
+
+            If index is out of bounds, it is clamped to within bounds.
 
-        @dummy.defjvp
-        def _dummy_jvp(nondiff_dr, x, xdot):
-            """Custom derivative rule for the function.
+            Parameters
+            ----------
+            index: int
+                which branch function to apply.
+            branches: Sequence[Callable]
+                sequence of functions (A -> B) to be applied based on index.
+            operand: any
+                inputs to whichever branch is applied.
+
+            Returns
+            -------
+            value: any
+                output of branches[index](*operand)
 
-            This is just the same function called with dx+1.
             """
-            (r, l, m) = x
-            (rdot, ldot, mdot) = xdot
-            f = dummy(r, l, m, nondiff_dr)
-            df = dummy(r, l, m, nondiff_dr + 1)
-            return f, (df.T * rdot).T + 0 * ldot + 0 * mdot
-
-        return jit(dummy, static_argnums=3)
-
-    def execute_on_cpu(func):
-        """Decorator to set default device to CPU for a function.
-
-        Parameters
-        ----------
-        func : callable
-            Function to decorate
-
-        Returns
-        -------
-        wrapper : callable
-            Decorated function that will run always on CPU even if
-            there are available GPUs.
-        """
-
-        @functools.wraps(func)
-        def wrapper(*args, **kwargs):
-            with jax.default_device(jax.devices("cpu")[0]):
-                return func(*args, **kwargs)
-
-        return wrapper
-
-else:
-    jit = lambda func, *args, **kwargs: func
-    custom_jvp_with_jit = lambda func, *args, **kwargs: func
-    execute_on_cpu = lambda func: func
-    from scipy.special import gammaln  # noqa F401
-
-    def put(arr, inds, vals):
-        """Functional interface for array "fancy indexing".
-
-        Provides a way to do arr[inds] = vals in a way that works with JAX.
-
-        Parameters
-        ----------
-        arr : array-like
-            Array to populate
-        inds : array-like of int
-            Indices to populate
-        vals : array-like
-            Values to insert
-
-        Returns
-        -------
-        arr : array-like
-            Input array with vals inserted at inds.
-
-        """
-        arr[inds] = vals
-        return arr
-
-    def sign(x):
-        """Sign function, but returns 1 for x==0.
-
-        Parameters
-        ----------
-        x : array-like
-            array of input values
-
-        Returns
-        -------
-        y : array-like
-            1 where x>=0, -1 where x<0
-
-        """
-        x = np.atleast_1d(x)
-        y = np.where(x == 0, 1, np.sign(x))
-        return y
-
-    def fori_loop(lower, upper, body_fun, init_val):
-        """Loop from lower to upper, applying body_fun to init_val.
-
-        This version is for the numpy backend, for jax backend see jax.lax.fori_loop
-
-        Parameters
-        ----------
-        lower : int
-            an integer representing the loop index lower bound (inclusive)
-        upper : int
-            an integer representing the loop index upper bound (exclusive)
-        body_fun : callable
-            function of type ``(int, a) -> a``.
-        init_val : array-like or container
-            initial loop carry value of type ``a``
-
-        Returns
-        -------
-        final_val: array-like or container
-            Loop value from the final iteration, of type ``a``.
-
-        """
-        val = init_val
-        for i in np.arange(lower, upper):
-            val = body_fun(i, val)
-        return val
-
-    def cond(pred, true_fun, false_fun, *operand):
-        """Conditionally apply true_fun or false_fun.
-
-        This version is for the numpy backend, for jax backend see jax.lax.cond
-
-        Parameters
-        ----------
-        pred: bool
-            which branch function to apply.
-        true_fun: callable
-            Function (A -> B), to be applied if pred is True.
-        false_fun: callable
-            Function (A -> B), to be applied if pred is False.
-        operand: any
-            input to either branch depending on pred. The type can be a scalar, array,
-            or any pytree (nested Python tuple/list/dict) thereof.
-
-        Returns
-        -------
-        value: any
-            value of either true_fun(operand) or false_fun(operand), depending on the
-            value of pred. The type can be a scalar, array, or any pytree (nested
-            Python tuple/list/dict) thereof.
-
-        """
-        if pred:
-            return true_fun(*operand)
-        else:
-            return false_fun(*operand)
-
-    def switch(index, branches, operand):
-        """Apply exactly one of branches given by index.
-
-        If index is out of bounds, it is clamped to within bounds.
-
-        Parameters
-        ----------
-        index: int
-            which branch function to apply.
-        branches: Sequence[Callable]
-            sequence of functions (A -> B) to be applied based on index.
-        operand: any
-            input to whichever branch is applied.
-
-        Returns
-        -------
-        value: any
-            output of branches[index](operand)
-
-        """
-        index = np.clip(index, 0, len(branches) - 1)
-        return branches[index](operand)
-
-    def while_loop(cond_fun, body_fun, init_val):
-        """Call body_fun repeatedly in a loop while cond_fun is True.
-
-        Parameters
-        ----------
-        cond_fun: callable
-            function of type a -> bool.
-        body_fun: callable
-            function of type a -> a.
-        init_val: any
-            value of type a, a type that can be a scalar, array, or any pytree (nested
-            Python tuple/list/dict) thereof, representing the initial loop carry value.
-
-        Returns
-        -------
-        value: any
-            The output from the final iteration of body_fun, of type a.
-
-        """
-        val = init_val
-        while cond_fun(val):
-            val = body_fun(val)
-        return val
-
-    def vmap(fun, out_axes=0):
-        """A numpy implementation of jax.lax.map whose API is a subset of jax.vmap.
-
-        Like Python's builtin map,
-        except inputs and outputs are in the form of stacked arrays,
-        and the returned object is a vectorized version of the input function.
-
-        Parameters
-        ----------
-        fun: callable
-            Function (A -> B)
-        out_axes: int
-            An integer indicating where the mapped axis should appear in the output.
-
-        Returns
-        -------
-        fun_vmap: callable
-            Vectorized version of fun.
-
-        """
-
-        def fun_vmap(fun_inputs):
-            return np.stack([fun(fun_input) for fun_input in fun_inputs], axis=out_axes)
-
-        return fun_vmap
-
-    def custom_jvp(fun, *args, **kwargs):
-        """Dummy function for custom_jvp without JAX."""
-        fun.defjvp = lambda *args, **kwargs: None
-        fun.defjvps = lambda *args, **kwargs: None
-        return fun
+            index = int(max(0, min(index, len(branches) - 1)))
+            return branches[index](*operand)
+
+        def while_loop(cond_fun, body_fun, init_val):
+            """Call body_fun repeatedly in a loop while cond_fun is True.
+
+            Parameters
+            ----------
+            cond_fun: callable
+                function of type a -> bool.
+            body_fun: callable
+                function of type a -> a.
+            init_val: any
+                value of type a, a type that can be a scalar, array, or any
+                pytree (nested Python tuple/list/dict) thereof, representing
+                the initial loop carry value.
+
+            Returns
+            -------
+            value: any
+                The output from the final iteration of body_fun, of type a.
+
+            """
+            val = init_val
+            while cond_fun(val):
+                val = body_fun(val)
+            return val
+
+        def vmap(fun, out_axes=0):
+            """A numpy implementation of jax.lax.map whose API is a subset of jax.vmap.
+
+            Like Python's builtin map,
+            except inputs and outputs are in the form of stacked arrays,
+            and the returned object is a vectorized version of the input
+            function.
+
+            Parameters
+            ----------
+            fun: callable
+                Function (A -> B)
+            out_axes: int
+                An integer indicating where the mapped axis should appear in
+                the output.
+
+            Returns
+            -------
+            fun_vmap: callable
+                Vectorized version of fun.
+
+            """
+
+            def fun_vmap(fun_inputs):
+                # probe the first element to get the output shape/dtype, then
+                # fill a preallocated array in place instead of stacking a
+                # list of per-element results (which doubles peak memory).
+                # The batch axis sits at out_axes in the allocation itself,
+                # so writes go through a view and the returned array needs
+                # no axis shuffling at all
+                n = len(fun_inputs)
+                y0 = fun(fun_inputs[0])
+                shape = np.shape(y0)
+                ax = out_axes % (len(shape) + 1)
+                out = np.empty(
+                    shape[:ax] + (n,) + shape[ax:], dtype=np.asarray(y0).dtype
+                )
+                view = np.moveaxis(out, ax, 0)
+                view[0] = y0
+                for i in range(1, n):
+                    view[i] = fun(fun_inputs[i])
+                return out
+
+            return fun_vmap
+
+        def custom_jvp(fun, *args, **kwargs):
+            """Dummy function for custom_jvp without JAX."""
+            fun.defjvp = lambda *args, **kwargs: None
+            fun.defjvps = lambda *args, **kwargs: None
+            return fun
+
+    # memoized log-gamma for static Python-int arguments (e.g. factorial
+    # terms in coefficient precomputes); repeated calls with the same small
+    # integer become a dict lookup instead of a transcendental evaluation
+    gammaln_int = functools.lru_cache(maxsize=512)(lambda n: float(gammaln(n)))
+
+    _globals = globals()
+    for _name, _val in locals().items():
+        if _name in _backend_attrs:
+            _globals[_name] = _val
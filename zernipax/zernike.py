@@ -1913,11 +1913,10 @@ def _jacobi_jvp(x, xdot):
     (ndot, alphadot, betadot, xdot, dxdot) = xdot
     f = _jacobi(n, alpha, beta, x, dx)
     df = _jacobi(n, alpha, beta, x, dx + 1)
-    # in theory n, alpha, beta, dx aren't differentiable (they're integers)
-    # but marking them as non-diff argnums seems to cause escaped tracer values.
-    # probably a more elegant fix, but just setting those derivatives to zero seems
-    # to work fine.
-    return f, df * xdot + 0 * ndot + 0 * alphadot + 0 * betadot + 0 * dxdot
+    # n, alpha, beta, dx aren't differentiable (they're integers), and the
+    # output tangent only depends on xdot, so their tangents don't appear
+    # here (multiplying by them also breaks on float0 tangents)
+    return f, df * xdot
 
 
 def polyder_vec(p, m, exact=False):